@@ -54,8 +54,9 @@ Use clear_errors() to clear the total number of errors.
 
 import sys
 from contextlib import contextmanager
+from typing import Callable, List
 
-_subscribers = []
+_subscribers: List[Callable[[str], None]] = []
 _num_errors = 0
 
 def error(lineno, message, filename=None):
@@ -9,6 +9,11 @@ each kind of grammar rule.  A few sample AST nodes can be found at the
 top of this file.  You will need to add more on your own.
 '''
 
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from exprtype import ExprType, Op
+
 # DO NOT MODIFY
 class AST(object):
     '''
@@ -18,7 +23,25 @@ class AST(object):
     arguments and assigns them to the appropriate fields.  Any
     additional arguments specified as keywords are also assigned. 
     '''
-    _fields = []
+    _fields: List[str] = []
+    # Subset of _fields holding a single child node (or None), and subset
+    # holding a list of child nodes.  These let generic_visit() recurse
+    # without testing the type of every attribute.
+    _node_fields: List[str] = []
+    _node_list_fields: List[str] = []
+    # Type attached by the checker.  Defaults to None so that consumers can
+    # read node.check_type directly instead of probing with hasattr().
+    check_type: Optional['ExprType'] = None
+    # Assigned by the parser as a keyword argument
+    lineno: int
+    # Set by the checker on each argument of a FuncCall
+    parm: 'FuncParameter'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls._node_fields + cls._node_list_fields:
+            assert name in cls._fields, "{}.{} is not in _fields".format(cls.__name__, name)
+
     def __init__(self,*args,**kwargs):
         assert len(args) == len(self._fields)
         for name,value in zip(self._fields,args):
@@ -44,6 +67,15 @@ class AST(object):
 #
 #    class Binop(AST):
 #        _fields = ['op','leftexpr','rightexpr']
+#        _node_fields = ['leftexpr','rightexpr']
+#
+# Fields that hold child nodes are also listed in _node_fields (a single
+# node) or _node_list_fields (a list of nodes) so that NodeVisitor can
+# walk them.
+#
+# The annotations under each _fields list declare the types of the
+# fields (plus any attribute attached later by the checker) for mypy.
+# They set no class attributes.
 #
 # Suggestion:  The nodes are listed here in a suggested order of work
 # on your parse.  You should start simple and incrementally work your
@@ -52,33 +84,56 @@ class AST(object):
 
 class Literal(AST):
     _fields = ['value']          
+    value: Any
 
 class Typename(AST):
     _fields = ['name']          
+    name: str
 
 class Location(AST):
     _fields = ['name']          
+    name: str
 
 class LoadLocation(AST):
-    _fields = ['location']          
+    _fields = ['location']
+    _node_fields = ['location']
+    location: Location
 
 class Unaryop(AST):
-    _fields = ['op','expr']           
+    _fields = ['op','expr']
+    _node_fields = ['expr']
+    op: 'Op'
+    expr: AST
 
 class Binop(AST):
-    _fields = ['op','left','right']          
+    _fields = ['op','left','right']
+    _node_fields = ['left', 'right']
+    op: 'Op'
+    left: AST
+    right: AST
     
 class Relop(AST):
-    _fields = ['op','left','right']          
+    _fields = ['op','left','right']
+    _node_fields = ['left', 'right']
+    op: 'Op'
+    left: AST
+    right: AST
     
 class AssignmentStatement(AST):
-    _fields = ['location','expr']          
+    _fields = ['location','expr']
+    _node_fields = ['location', 'expr']
+    location: Location
+    expr: AST
 
 class PrintStatement(AST):
-    _fields = ['expr']          
+    _fields = ['expr']
+    _node_fields = ['expr']
+    expr: AST
     
 class Statements(AST):
-    _fields = ['statements']          
+    _fields = ['statements']
+    _node_list_fields = ['statements']
+    statements: List[AST]
 
     def append(self,stmt):
         self.statements.append(stmt)
@@ -88,25 +143,57 @@ class Statements(AST):
 
 
 class Program(AST):
-    _fields = ['statements']          
+    _fields = ['statements']
+    _node_fields = ['statements']
+    statements: Optional[Statements]
+    # Attached by the checker
+    environment: Any
+    symtab: Dict[str, Any]
 
 class VarDeclaration(AST):
-    _fields = ['name','typename','expr']          
+    _fields = ['name','typename','expr']
+    _node_fields = ['typename', 'expr']
+    name: str
+    typename: Typename
+    expr: Optional[AST]
+    scope_level: int
+    # Symbol kind, checked by the type checker instead of isinstance()
+    _kind = 'var'
     
 class ConstDeclaration(AST):
-    _fields = ['name','expr']          
+    _fields = ['name','expr']
+    _node_fields = ['expr']
+    name: str
+    expr: AST
+    scope_level: int
+    _kind = 'const'
     
 class IfStatement(AST):
     _fields = ['expr', 'truebranch', 'falsebranch']
+    _node_fields = ['expr', 'truebranch', 'falsebranch']
+    expr: AST
+    truebranch: Statements
+    falsebranch: Optional[Statements]
 
 class WhileStatement(AST):
     _fields = ['expr', 'truebranch']
+    _node_fields = ['expr', 'truebranch']
+    expr: AST
+    truebranch: Statements
 
 class FuncStatement(AST):
     _fields = ['name', 'returntype', 'parameters', 'expr']
+    _node_fields = ['returntype', 'parameters', 'expr']
+    name: str
+    returntype: Typename
+    parameters: Optional['FuncParameterList']
+    expr: Statements
+    scope_level: int
 
 class FuncParameterList(AST):
     _fields = ['parameters']
+    _node_list_fields = ['parameters']
+    parameters: List['FuncParameter']
 
     def append(self,stmt):
         self.parameters.append(stmt)
@@ -119,9 +206,14 @@ class FuncParameter(VarDeclaration):
 
 class FuncCall(AST):
     _fields = ['name', 'arguments']
+    _node_fields = ['arguments']
+    name: str
+    arguments: Optional['FuncCallArguments']
 
 class FuncCallArguments(AST):
     _fields = ['arguments']
+    _node_list_fields = ['arguments']
+    arguments: List[AST]
 
     def append(self,stmt):
         self.arguments.append(stmt)
@@ -131,9 +223,13 @@ class FuncCallArguments(AST):
 
 class FuncCallArgument(AST):
     _fields = ['expr']
+    _node_fields = ['expr']
+    expr: AST
 
 class ReturnStatement(AST):
     _fields = ['expr']
+    _node_fields = ['expr']
+    expr: AST
 
 
 # ----------------------------------------------------------------------
@@ -181,17 +277,15 @@ class NodeVisitor(object):
     def generic_visit(self,node):
         '''
         Method executed if no applicable visit_ method can be found.
-        This examines the node to see if it has _fields, is a list,
-        or can be further traversed.
+        This visits the children listed in the node's _node_fields and
+        _node_list_fields.
         '''
-        for field in getattr(node,"_fields"):
-            value = getattr(node,field,None)
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item,AST):
-                        self.visit(item)
-            elif isinstance(value, AST):
-                self.visit(value)
+        visit = self.visit
+        for field in node._node_fields:
+            visit(getattr(node,field,None))
+        for field in node._node_list_fields:
+            for item in getattr(node,field):
+                visit(item)
 
 # DO NOT MODIFY
 class NodeTransformer(NodeVisitor):
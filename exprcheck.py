@@ -86,68 +86,80 @@ For walking the AST, use the NodeVisitor class defined in exprast.py.
 A shell of the code is provided below.
 '''
 
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from errors import error
 from exprast import *
-from exprtype import IntType, FloatType, StringType, BoolType, ExprType
+from exprtype import IntType, FloatType, StringType, BoolType, ExprType, Op, OP_NAMES
 from pprint import pprint
 
-class SymbolTable(dict):
-    '''
-    Class representing a symbol table.  It should provide functionality
-    for adding and looking up nodes associated with identifiers.
-    '''
-    def __init__(self, decl=None):
-        super().__init__()
-        self.decl = decl
-    def add(self, name, value):
-        self[name] = value
-    def lookup(self, name):
-        return self.get(name, None)
-    def return_type(self):
-        if self.decl:
-            return self.decl.returntype
-        return None
+# Python type of a literal value -> Expr type.  Keyed on the exact type so
+# that bool values are not mistaken for ints.
+_TYPEMAP = {
+    int: IntType,
+    float: FloatType,
+    str: StringType,
+    bool: BoolType
+}
 
 class Environment(object):
-    def __init__(self):
-        self.stack = []
-        self.root = SymbolTable()
-        self.stack.append(self.root)
-        self.root.update({
+    '''
+    Stack of scopes.  Each scope is a plain dict mapping identifiers to
+    the nodes (or types) they refer to; the declaration that encloses
+    each scope is tracked in a parallel stack.
+    '''
+    def __init__(self) -> None:
+        self.root: Dict[str, Any] = {
             "int": IntType,
             "float": FloatType,
             "string": StringType,
             "bool": BoolType
-        })
+        }
+        self.stack: List[Dict[str, Any]] = [self.root]
+        self.decls: List[Optional[FuncStatement]] = [None]
 
-    def push(self, enclosure):
-        self.stack.append(SymbolTable(decl=enclosure))
+    def push(self, enclosure: FuncStatement) -> None:
+        self.stack.append({})
+        self.decls.append(enclosure)
 
-    def pop(self):
+    def pop(self) -> None:
         self.stack.pop()
+        self.decls.pop()
 
-    def peek(self):
+    def peek(self) -> Dict[str, Any]:
         return self.stack[-1]
 
-    def scope_level(self):
+    def scope_level(self) -> int:
         return len(self.stack)
 
-    def add_local(self, name, value):
-        self.peek().add(name, value)
+    def return_type(self) -> Optional[Typename]:
+        decl = self.decls[-1]
+        if decl:
+            return decl.returntype
+        return None
+
+    def add_local(self, name: str, value: Any) -> None:
+        self.stack[-1][name] = value
 
-    def add_root(self, name, value):
-        self.root.add(name, value)
+    def add_root(self, name: str, value: Any) -> None:
+        self.root[name] = value
 
-    def lookup(self, name):
+    def __contains__(self, name: str) -> bool:
+        for scope in self.stack:
+            if name in scope:
+                return True
+        return False
+
+    def lookup(self, name: str) -> Any:
         for scope in reversed(self.stack):
-            hit = scope.lookup(name)
+            hit = scope.get(name)
             if hit is not None:
                 return hit
         return None
 
-    def print(self):
-        for indent, scope in enumerate(reversed(self.stack)):
-            print("Scope for {}".format("ROOT" if scope.decl is None else scope.decl))
+    def print(self) -> None:
+        for indent, (scope, decl) in enumerate(zip(reversed(self.stack), reversed(self.decls))):
+            print("Scope for {}".format("ROOT" if decl is None else decl))
             pprint(scope, indent=indent*4, width=20)
 
 class CheckProgramVisitor(NodeVisitor):
@@ -159,157 +171,244 @@ class CheckProgramVisitor(NodeVisitor):
     Note: You will need to adjust the names of the AST nodes if you
     picked different names.
     '''
-    def __init__(self):
-        self.environment = Environment()
-        self.typemap = {
-            int: IntType, 
-            float: FloatType, 
-            str: StringType,
-            bool: BoolType
+    def __init__(self) -> None:
+        self.environment: Environment = Environment()
+        # Precomputed node class -> visitor method table.  This avoids
+        # building a 'visit_' + classname string and doing a getattr()
+        # for every node that gets visited.
+        self._dispatch: Dict[type, Callable[[Any], None]] = {
+            Program: self.visit_Program,
+            Unaryop: self.visit_Unaryop,
+            Binop: self.visit_Binop,
+            Relop: self.visit_Relop,
+            AssignmentStatement: self.visit_AssignmentStatement,
+            IfStatement: self.visit_IfStatement,
+            WhileStatement: self.visit_WhileStatement,
+            ConstDeclaration: self.visit_ConstDeclaration,
+            FuncStatement: self.visit_FuncStatement,
+            FuncParameterList: self.visit_FuncParameterList,
+            FuncParameter: self.visit_FuncParameter,
+            FuncCall: self.visit_FuncCall,
+            FuncCallArguments: self.visit_FuncCallArguments,
+            ReturnStatement: self.visit_ReturnStatement,
+            PrintStatement: self.visit_PrintStatement,
+            VarDeclaration: self.visit_VarDeclaration,
+            Typename: self.visit_Typename,
+            Location: self.visit_Location,
+            LoadLocation: self.visit_LoadLocation,
+            Literal: self.visit_Literal,
+        }
+        # Post-order handlers for operator nodes; see check_expression()
+        self._finish: Dict[type, Callable[[Any], None]] = {
+            Unaryop: self._finish_Unaryop,
+            Binop: self._finish_Binop,
+            Relop: self._finish_Relop,
         }
+        # Memoized operator checks.  Each entry holds (result_type, errtag);
+        # see check_type_unary() and _check_binary().
+        self._unaryop_cache: Dict[Tuple[Op, ExprType], Tuple[Optional[ExprType], Optional[str]]] = {}
+        self._binary_cache: Dict[Tuple[str, Op, ExprType, ExprType], Tuple[Optional[ExprType], Optional[str]]] = {}
+
+    def visit(self, node: Any) -> Any:
+        '''
+        Dispatch to the visit_NodeName() method for node by looking up its
+        class in the precomputed dispatch table.  Nodes without an entry
+        fall back to generic_visit().
+        '''
+        if node:
+            fn = self._dispatch.get(type(node))
+            return fn(node) if fn else self.generic_visit(node)
+        return None
 
-    def check_type_unary(self, node, op, val):
-        if hasattr(val, "check_type"):
-            if op not in val.check_type.unary_ops:
-                error(node.lineno, "Unary operator {} not supported".format(op))
-            return val.check_type
-
-    def check_type_binary(self, node, op, left, right):
-        if hasattr(left, "check_type") and hasattr(right, "check_type"):
-            if left.check_type != right.check_type:
-                error(node.lineno, "Binary operator {} does not have matching LHS/RHS types".format(op))
-                return left.check_type
-            errside = None
-            if op not in left.check_type.binary_ops:
-                errside = "LHS"
-            if op not in right.check_type.binary_ops:
-                errside = "RHS"
-            if errside is not None:
-                error(node.lineno, "Binary operator {} not supported on {} of expression".format(op, errside))
-            # XXX: right now we just propagate the left type, but we should probably handle error conditions
-            return left.check_type
-
-    def check_type_rel(self, node, op, left, right):
-        if hasattr(left, "check_type") and hasattr(right, "check_type"):
-            if left.check_type != right.check_type:
-                error(node.lineno, "Relational operator {} does not have matching LHS/RHS types".format(op))
-                return left.check_type
-            errside = None
-            if op not in left.check_type.rel_ops:
-                errside = "LHS"
-            if op not in right.check_type.rel_ops:
-                errside = "RHS"
-            if errside is not None:
-                error(node.lineno, "Relational operator {} not supported on {} of expression".format(op, errside))
-            # XXX: right now we just propagate the left type, but we should probably handle error conditions
-            return BoolType
-
-    def inside_function(self):
+    def check_type_unary(self, node: AST, op: Op, val: AST) -> Optional[ExprType]:
+        vt = val.check_type
+        if vt is None:
+            return None
+        key = (op, vt)
+        entry = self._unaryop_cache.get(key)
+        if entry is None:
+            if not (vt.unary_mask >> op) & 1:
+                entry = (None, "unsupported")
+            else:
+                entry = (vt, None)
+            self._unaryop_cache[key] = entry
+        check_type, errtag = entry
+        if errtag is not None:
+            error(node.lineno, "Unary operator {} not supported".format(OP_NAMES[op]))
+        return check_type
+
+    def _check_binary(self, node: AST, op: Op, left: AST, right: AST,
+                      mask_attr: str, result_type: Optional[ExprType], kind: str) -> Optional[ExprType]:
+        '''
+        Shared checking for binary and relational operators.  mask_attr names
+        the ExprType attribute holding the bitmask of supported operators
+        ("binary_mask" or "rel_mask"), result_type is the type produced
+        when the check passes (None meaning the operand type) and kind is
+        the word used in error messages.  The outcome for each
+        (mask_attr, op, ltype, rtype) combination is cached as
+        (result_type, errtag) where errtag is "mismatch", "LHS", "RHS" or
+        None.
+
+        A failed check yields None rather than a guessed type, so that
+        enclosing expressions and statements skip their own checks instead
+        of reporting errors that follow from this one.
+        '''
+        lt = left.check_type
+        rt = right.check_type
+        if lt is None or rt is None:
+            return None
+        key = (mask_attr, op, lt, rt)
+        entry = self._binary_cache.get(key)
+        if entry is None:
+            if lt is not rt:
+                entry = (None, "mismatch")
+            elif not (getattr(lt, mask_attr) >> op) & 1:
+                # Both sides have the same type here, so one lookup covers
+                # both; an unsupported op has always been reported as RHS.
+                entry = (None, "RHS")
+            else:
+                entry = (lt if result_type is None else result_type, None)
+            self._binary_cache[key] = entry
+        check_type, errtag = entry
+        if errtag == "mismatch":
+            error(node.lineno, "{} operator {} does not have matching LHS/RHS types".format(kind, OP_NAMES[op]))
+        elif errtag is not None:
+            error(node.lineno, "{} operator {} not supported on {} of expression".format(kind, OP_NAMES[op], errtag))
+        return check_type
+
+    def inside_function(self) -> bool:
         return self.environment.scope_level() > 1
 
-    def visit_Program(self,node):
+    def visit_Program(self, node: Program) -> None:
         node.environment = self.environment
         node.symtab = self.environment.peek()
-        # 1. Visit all of the statements
+        visit = self.visit
+        add = self.environment.add_local
+        # 1. Visit all of the statements (an empty program has none)
+        if node.statements is None:
+            return
         for statement in node.statements.statements:
-            self.visit(statement)
+            visit(statement)
             # 2. Record the associated symbol table
-            if isinstance(statement, AssignmentStatement):
-                self.environment.add_local(statement.location.name, statement.expr)
-
-    def visit_Unaryop(self,node):
-        self.visit(node.expr)
+            if type(statement) is AssignmentStatement:
+                add(statement.location.name, statement.expr)
+
+    def visit_Unaryop(self, node: Unaryop) -> None:
+        self.check_expression(node)
+
+    def visit_Binop(self, node: Binop) -> None:
+        self.check_expression(node)
+
+    def visit_Relop(self, node: Relop) -> None:
+        self.check_expression(node)
+
+    def check_expression(self, node: AST) -> None:
+        '''
+        Check an operator expression without recursing through visit().
+        Operator nodes are walked in post-order using an explicit stack, so
+        by the time an operator is finished its operands already have their
+        check_type set.  Any other node (literals, loads) is handed to
+        visit() as a leaf.  This keeps deeply nested expressions such as
+        long chains of '+' from using one Python frame per level.
+        '''
+        finish = self._finish
+        visit = self.visit
+        stack = [(node, False)]
+        while stack:
+            n, seen = stack.pop()
+            fn = finish.get(type(n))
+            if fn is None:
+                visit(n)
+            elif seen:
+                fn(n)
+            else:
+                stack.append((n, True))
+                # Push operands right to left so they are checked left to
+                # right, keeping error messages in source order
+                for field in reversed(n._node_fields):
+                    stack.append((getattr(n, field), False))
+
+    def _finish_Unaryop(self, node: Unaryop) -> None:
         # 1. Make sure that the operation is supported by the type
-        check_type = self.check_type_unary(node, node.op, node.expr)
         # 2. Set the result type to the same as the operand
-        node.check_type = check_type
+        node.check_type = self.check_type_unary(node, node.op, node.expr)
 
-    def visit_Binop(self,node):
+    def _finish_Binop(self, node: Binop) -> None:
         # 1. Make sure left and right operands have the same type
         # 2. Make sure the operation is supported
-        # AM note: both are done in check_type_binary
-        self.visit(node.left)
-        self.visit(node.right)
-        check_type = self.check_type_binary(node, node.op, node.left, node.right)
         # 3. Assign the result type
-        node.check_type = check_type
+        # AM note: all done in _check_binary
+        node.check_type = self._check_binary(node, node.op, node.left, node.right, "binary_mask", None, "Binary")
 
-    def visit_Relop(self,node):
-        # 1. Make sure left and right operands have the same type
-        # 2. Make sure the operation is supported
-        # AM note: both are done in check_type_binary
-        self.visit(node.left)
-        self.visit(node.right)
-        check_type = self.check_type_rel(node, node.op, node.left, node.right)
-        # 3. Assign the result type
-        node.check_type = check_type
+    def _finish_Relop(self, node: Relop) -> None:
+        # Same as _finish_Binop, but the result is always a bool
+        node.check_type = self._check_binary(node, node.op, node.left, node.right, "rel_mask", BoolType, "Relational")
 
-    def visit_AssignmentStatement(self,node):
+    def visit_AssignmentStatement(self, node: AssignmentStatement) -> None:
+        name = node.location.name
         if not self.inside_function():
-            error(node.lineno, "Cannot assign variable '{}' outside function body".format(node.location.name))
+            error(node.lineno, "Cannot assign variable '{}' outside function body".format(name))
             return
         # 1. Make sure the location of the assignment is defined
-        sym = self.environment.lookup(node.location.name)
+        sym = self.environment.lookup(name)
         if not sym:
-            error(node.lineno, "name '{}' not defined".format(node.location.name))
-        # 2. Check that assignment is allowed
-        self.visit(node.expr)
-        if isinstance(sym, VarDeclaration):
+            error(node.lineno, "name '{}' not defined".format(name))
+        # 2. Check that assignment is allowed and that the types match
+        expr = node.expr
+        self.visit(expr)
+        kind = getattr(sym, "_kind", None)
+        if kind == "var":
             # empty var declaration, so check against the declared type name
-            if hasattr(sym, "check_type") and hasattr(node.expr, "check_type"):
-                declared_type = sym.check_type
-                value_type = node.expr.check_type
-                if declared_type != value_type:
+            declared_type = sym.check_type
+            value_type = expr.check_type
+            if declared_type is not None and value_type is not None:
+                if declared_type is not value_type:
                     error(node.lineno, "Cannot assign {} to {}".format(value_type, declared_type))
                     return
-        if isinstance(sym, ConstDeclaration):
+        elif kind == "const":
             error(node.lineno, "Cannot assign to constant {}".format(sym.name))
             return
-        # 3. Check that the types match
-        if hasattr(node.location, "check_type") and hasattr(node.expr, "check_type"):
-            declared_type = node.location.check_type
-            value_type = node.expr.check_type
-            if declared_type != value_type:
-                error(node.lineno, "Cannot assign {} to {}".format(value_type, declared_type))
 
-    def visit_IfStatement(self,node):
+    def visit_IfStatement(self, node: IfStatement) -> None:
         if not self.inside_function():
             error(node.lineno, "Cannot use if statement outside function body")
             return
         self.visit(node.expr)
-        if node.expr.check_type != BoolType:
+        check_type = node.expr.check_type
+        if check_type is not None and check_type is not BoolType:
             error(node.lineno, "Expression in if statement must evaluate to bool")
         self.visit(node.truebranch)
         if node.falsebranch is not None:
             self.visit(node.falsebranch)
 
-    def visit_WhileStatement(self,node):
+    def visit_WhileStatement(self, node: WhileStatement) -> None:
         if not self.inside_function():
             error(node.lineno, "Cannot use while statement outside function body")
             return
         self.visit(node.expr)
-        if node.expr.check_type != BoolType:
+        check_type = node.expr.check_type
+        if check_type is not None and check_type is not BoolType:
             error(node.lineno, "Expression in while statement must evaluate to bool")
         self.visit(node.truebranch)
 
-    def visit_ConstDeclaration(self,node):
+    def visit_ConstDeclaration(self, node: ConstDeclaration) -> None:
         node.scope_level = self.environment.scope_level()
         # 1. Check that the constant name is not already defined
-        if self.environment.lookup(node.name) is not None:
+        if node.name in self.environment:
             error(node.lineno, "Attempted to redefine const '{}', not allowed".format(node.name))
         # 2. Add an entry to the symbol table
         self.environment.add_local(node.name, node)
         self.visit(node.expr)
         node.check_type = node.expr.check_type
 
-    def visit_FuncStatement(self, node):
+    def visit_FuncStatement(self, node: FuncStatement) -> None:
         # 1. Check that the variable name is not already defined
         node.scope_level = self.environment.scope_level()
         if node.scope_level > 1:
             error(node.lineno, "Nested functions not implemented")
             return
         self.environment.push(node)
-        if self.environment.lookup(node.name) is not None:
+        if node.name in self.environment:
             error(node.lineno, "Attempted to redefine func '{}', not allowed".format(node.name))
             return
         # 2. Add an entry to the symbol table, and also create a nested symbol
@@ -317,23 +416,23 @@ class CheckProgramVisitor(NodeVisitor):
         self.environment.add_root(node.name, node)
         # 3. Propagate the returntype as a checktype for the function, for 
         # use in function call checking and return statement checking
-        if hasattr(node.returntype, "check_type"):
-            node.check_type = node.returntype.check_type
+        self.visit(node.returntype)
+        node.check_type = node.returntype.check_type
         self.visit(node.parameters)
         self.visit(node.expr)
         self.environment.pop()
 
-    def visit_FuncParameterList(self, node):
+    def visit_FuncParameterList(self, node: FuncParameterList) -> None:
         for parameter in node.parameters:
             self.visit(parameter)
 
-    def visit_FuncParameter(self, node):
+    def visit_FuncParameter(self, node: FuncParameter) -> None:
         self.environment.add_local(node.name, node)
         node.scope_level = self.environment.scope_level()
         self.visit(node.typename)
         node.check_type = node.typename.check_type
 
-    def visit_FuncCall(self, node):
+    def visit_FuncCall(self, node: FuncCall) -> None:
         if not self.inside_function():
             error(node.lineno, "Cannot call function from outside function body; see main() for entry point")
             return
@@ -345,37 +444,49 @@ class CheckProgramVisitor(NodeVisitor):
         if not isinstance(sym, FuncStatement):
             error(node.lineno, "Tried to call non-function '{}'".format(node.name))
             return
-        if len(sym.parameters) != len(node.arguments):
+        # An empty argument or parameter list is parsed as None
+        arguments = node.arguments.arguments if node.arguments else []
+        parameters = sym.parameters.parameters if sym.parameters else []
+        if len(parameters) != len(arguments):
             error(node.lineno, "Number of arguments for call to function '{}' do not match function parameter declaration on line {}".format(node.name, sym.lineno))
         self.visit(node.arguments)
         argerrors = False
-        for arg, parm in zip(node.arguments.arguments, sym.parameters.parameters):
-            if arg.check_type != parm.check_type:
+        for arg, parm in zip(arguments, parameters):
+            if arg.check_type is None or parm.check_type is None:
+                continue
+            if arg.check_type is not parm.check_type:
                 error(node.lineno, "Argument type '{}' does not match parameter type '{}' in function call to '{}'".format(arg.check_type.typename, parm.check_type.typename, node.name))
                 argerrors = True
             if argerrors:
                 return
             arg.parm = parm
 
-    def visit_FuncCallArguments(self, node):
+    def visit_FuncCallArguments(self, node: FuncCallArguments) -> None:
         for argument in node.arguments:
             self.visit(argument)
 
-    def visit_ReturnStatement(self, node):
+    def visit_ReturnStatement(self, node: ReturnStatement) -> None:
+        returntype = self.environment.return_type()
+        if returntype is None:
+            error(node.lineno, "Cannot use return statement outside function body")
+            return
         self.visit(node.expr)
-        if self.environment.peek().return_type() != node.expr.check_type:
+        # Skip the comparison if either type is invalid (already reported)
+        if node.expr.check_type is None or returntype.check_type is None:
+            return
+        if returntype.check_type is not node.expr.check_type:
             error(node.lineno, "Type of return statement expression does not match declared return type for function")
             return
 
-    def visit_PrintStatement(self, node):
+    def visit_PrintStatement(self, node: PrintStatement) -> None:
         if not self.inside_function():
             error(node.lineno, "Cannot use print statement outside function body")
             return
         self.visit(node.expr)
 
-    def visit_VarDeclaration(self,node):
+    def visit_VarDeclaration(self, node: VarDeclaration) -> None:
         # 1. Check that the variable name is not already defined
-        if self.environment.lookup(node.name) is not None:
+        if node.name in self.environment:
             error(node.lineno, "Attempted to redefine var '{}', not allowed".format(node.name))
             return
         # 2. Add an entry to the symbol table
@@ -383,17 +494,25 @@ class CheckProgramVisitor(NodeVisitor):
         # 3. Check that the type of the expression (if any) is the same
         self.visit(node.typename)
         # propagate check_type from Typename up to Var declaration
-        if hasattr(node.typename, "check_type"):
-            node.check_type = node.typename.check_type
-        # 4. If there is no expression, set an initial value for the value
-        self.visit(node.expr)
+        node.check_type = node.typename.check_type
+        # 4. If there is no expression, set an initial value for the value.
+        # Otherwise check the initializer against the declared type.
         if node.expr is None:
-            default = node.check_type.default
-            node.expr = Literal(default)
-            node.expr.check_type = node.check_type
+            # No default when the typename was invalid (already reported)
+            if node.check_type is not None:
+                default = node.check_type.default
+                node.expr = Literal(default)
+                node.expr.check_type = node.check_type
+        else:
+            self.visit(node.expr)
+            declared_type = node.check_type
+            value_type = node.expr.check_type
+            if declared_type is not None and value_type is not None:
+                if declared_type is not value_type:
+                    error(node.lineno, "Cannot assign {} to {}".format(value_type, declared_type))
         node.scope_level = self.environment.scope_level()
 
-    def visit_Typename(self,node):
+    def visit_Typename(self, node: Typename) -> None:
         # 1. Make sure the typename is valid and that it's actually a type
         sym = self.environment.lookup(node.name)
         if not isinstance(sym, ExprType):
@@ -401,7 +520,7 @@ class CheckProgramVisitor(NodeVisitor):
             return
         node.check_type = sym
 
-    def visit_Location(self,node):
+    def visit_Location(self, node: Location) -> None:
         # 1. Make sure the location is a valid variable or constant value
         sym = self.environment.lookup(node.name)
         if not sym:
@@ -409,28 +528,26 @@ class CheckProgramVisitor(NodeVisitor):
         # 2. Assign the type of the location to the node
         node.check_type = sym.check_type
 
-    def visit_LoadLocation(self, node):
+    def visit_LoadLocation(self, node: LoadLocation) -> None:
         # 1. Make sure the loaded location is valid
         sym = self.environment.lookup(node.location.name)
         if not sym:
             error(node.lineno, "name '{}' not found".format(node.location.name))
             return
         # 2. Assign the appropriate type
-        if isinstance(sym, ExprType):
+        if getattr(sym, "_kind", None) == "type":
             error(node.lineno, "cannot use {} outside of variable declarations".format(sym.typename))
             return
-        check_type = sym.check_type
-        if check_type is None:
-            error(node.lineno, "Using unrecognized type {}".format(valtype))
-        node.check_type = check_type
+        # A declaration whose type could not be determined has no type;
+        # its error was already reported, so the load just stays untyped.
+        node.check_type = sym.check_type
 
-    def visit_Literal(self,node):
+    def visit_Literal(self, node: Literal) -> None:
         # Attach an appropriate type to the literal
-        valtype = type(node.value)
-        check_type = self.typemap.get(valtype, None)
-        if check_type is None:
-            error(node.lineno, "Using unrecognized type {}".format(valtype))
-        node.check_type = check_type
+        try:
+            node.check_type = _TYPEMAP[type(node.value)]
+        except KeyError:
+            error(node.lineno, "Using unrecognized type {}".format(type(node.value)))
         
 # ----------------------------------------------------------------------
 #                       DO NOT MODIFY ANYTHING BELOW       
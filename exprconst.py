@@ -127,7 +127,7 @@ class ConstantFolder(exprast.NodeTransformer):
     def visit_LoadLocation(self,node):
         # If the lookup location is a constant (found in symbol table),
         # replace the node with a Literal node that has the value of the constant
-        sym = self.symtab.lookup(node.location.name)
+        sym = self.symtab.get(node.location.name)
         if sym is not None and isinstance(sym, exprast.ConstDeclaration):
             node = self.visit(sym.expr)
             if self.debug:
@@ -110,6 +110,12 @@ from exprlex import tokens
 # Read instructions in exprast.py
 from exprast import *
 
+# ----------------------------------------------------------------------
+# Operator nodes record an exprtype.Op rather than the operator's text.
+# Op members are singletons, so every node shares the same canonical
+# operator object and no per-node strings need to be interned.
+from exprtype import OP_SYMBOLS
+
 # ----------------------------------------------------------------------
 # Operator precedence table.   Operators must follow the same 
 # precedence rules as in Python.  Instructions to be given in the project.
@@ -322,7 +328,7 @@ def p_expression_unary(p):
                | MINUS expression %prec UNARY
                | NOT expression %prec UNARY
     '''
-    p[0] = Unaryop(p[1],p[2],lineno=p.lineno(1))
+    p[0] = Unaryop(OP_SYMBOLS[p[1]],p[2],lineno=p.lineno(1))
 
 def p_expression_binary(p):
     '''
@@ -331,7 +337,7 @@ def p_expression_binary(p):
                | expression TIMES expression
                | expression DIVIDE expression
     '''
-    p[0] = Binop(p[2],p[1],p[3],lineno=p.lineno(2))
+    p[0] = Binop(OP_SYMBOLS[p[2]],p[1],p[3],lineno=p.lineno(2))
 
 def p_expression_rel(p):
     '''
@@ -344,7 +350,7 @@ def p_expression_rel(p):
                | expression LAND expression
                | expression LOR expression
     '''
-    p[0] = Relop(p[2],p[1],p[3],lineno=p.lineno(2))
+    p[0] = Relop(OP_SYMBOLS[p[2]],p[1],p[3],lineno=p.lineno(2))
 
 def p_expression_group(p):
     '''
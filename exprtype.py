@@ -28,13 +28,83 @@ code that checks for type names in 'exprcheck.py'.
 Note:  This file is expanded in later stages of the compiler project.
 '''
 
+import enum
 import operator
 
+class Op(enum.IntEnum):
+    '''
+    Operators of the Expr language.  The parser stores one of these
+    (rather than the operator's source text) in the op field of Unaryop,
+    Binop and Relop nodes, and the per-type operator tables below are
+    keyed on them.  Values start at 1 so that every operator is truthy.
+    '''
+    ADD = 1
+    SUB = 2
+    MUL = 3
+    DIV = 4
+    EQ = 5
+    NEQ = 6
+    LT = 7
+    GT = 8
+    LTE = 9
+    GTE = 10
+    LAND = 11
+    LOR = 12
+    NOT = 13
+
+    # Print as the operator's source text, both in AST dumps and in
+    # str()/format() (IntEnum would otherwise print the number)
+    def __repr__(self):
+        return repr(OP_NAMES[self])
+
+    def __str__(self):
+        return OP_NAMES[self]
+
+    def __format__(self, spec):
+        return format(OP_NAMES[self], spec)
+
+OP_ADD = Op.ADD
+OP_SUB = Op.SUB
+OP_MUL = Op.MUL
+OP_DIV = Op.DIV
+OP_EQ = Op.EQ
+OP_NEQ = Op.NEQ
+OP_LT = Op.LT
+OP_GT = Op.GT
+OP_LTE = Op.LTE
+OP_GTE = Op.GTE
+OP_LAND = Op.LAND
+OP_LOR = Op.LOR
+OP_NOT = Op.NOT
+
+# Source text of each operator, for error messages.  Unary + and - share
+# OP_ADD and OP_SUB with their binary forms.
+OP_NAMES = {
+    OP_ADD: "+", OP_SUB: "-", OP_MUL: "*", OP_DIV: "/",
+    OP_EQ: "==", OP_NEQ: "!=", OP_LT: "<", OP_GT: ">", OP_LTE: "<=", OP_GTE: ">=",
+    OP_LAND: "&&", OP_LOR: "||", OP_NOT: "!"
+}
+# Operator source text -> Op, used by the parser
+OP_SYMBOLS = {name: op for op, name in OP_NAMES.items()}
+
+def _op_mask(ops):
+    '''
+    Return an integer with bit n set for each operator Op(n) in ops.
+    '''
+    mask = 0
+    for op in ops:
+        mask |= 1 << op
+    return mask
+
 class ExprType(object):
     '''
     Class that represents a type in the Expr language.  Types 
-    are declared as singleton instances of this type.
+    are declared as singleton instances of this type.  Code that
+    compares types relies on this and uses identity (is / is not).
     '''
+    # Symbol kind, matching VarDeclaration._kind etc. in exprast.py
+    _kind = 'type'
+
     def __init__(self, typename, default, 
                  unary_opcodes=None, binary_opcodes=None, 
                  binary_ops=None, unary_ops=None,
@@ -44,14 +114,21 @@ class ExprType(object):
         You must implement yourself and figure out what to store.
         '''
         self.typename = typename
-        self.binary_ops = binary_ops or set()
-        self.unary_ops = unary_ops or set()
+        self.binary_ops = frozenset(binary_ops or ())
+        self.unary_ops = frozenset(unary_ops or ())
         self.default = default
         self.unary_opcodes = unary_opcodes or {}
         self.binary_opcodes = binary_opcodes or {}
         self.unary_folds = unary_folds or set()
         self.binary_folds = binary_folds or set()
-        self.rel_ops = rel_ops or set()
+        self.rel_ops = frozenset(rel_ops or ())
+        # The same operator sets as bitmasks (bit n set for Op n), so that
+        # support can be tested with a shift and an AND.  The checker only
+        # tests them when filling its operator caches; checking a node is
+        # still a dict lookup on the cache.
+        self.binary_mask = _op_mask(self.binary_ops)
+        self.unary_mask = _op_mask(self.unary_ops)
+        self.rel_mask = _op_mask(self.rel_ops)
         self.rel_opcodes = rel_opcodes or {}
         self.rel_folds = rel_folds or {}
 
@@ -59,42 +136,42 @@ class ExprType(object):
         return "ExprType({})".format(self.typename)
 
 IntType = ExprType("int", int(), 
-    binary_ops={"+", "-", "*", "/"}, 
-    unary_ops={"+", "-"},
-    binary_opcodes={"+": "add", "-": "sub", "*": "imul", "/": "idiv"},
-    unary_opcodes={"+": "uadd", "-": "uneg"},
-    binary_folds={"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.floordiv},
-    unary_folds={"+": operator.pos, "-": operator.neg},
-    rel_ops={"==", "!=", "<", ">", "<=", ">="},
-    rel_opcodes={"==": "eq", "!=": "neq", ">": "gt", "<": "lt", ">=": "gte", "<=": "lte"},
-    rel_folds={"==": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge,
-               "<": operator.lt, "<=": operator.le}
+    binary_ops={OP_ADD, OP_SUB, OP_MUL, OP_DIV}, 
+    unary_ops={OP_ADD, OP_SUB},
+    binary_opcodes={OP_ADD: "add", OP_SUB: "sub", OP_MUL: "imul", OP_DIV: "idiv"},
+    unary_opcodes={OP_ADD: "uadd", OP_SUB: "uneg"},
+    binary_folds={OP_ADD: operator.add, OP_SUB: operator.sub, OP_MUL: operator.mul, OP_DIV: operator.floordiv},
+    unary_folds={OP_ADD: operator.pos, OP_SUB: operator.neg},
+    rel_ops={OP_EQ, OP_NEQ, OP_LT, OP_GT, OP_LTE, OP_GTE},
+    rel_opcodes={OP_EQ: "eq", OP_NEQ: "neq", OP_GT: "gt", OP_LT: "lt", OP_GTE: "gte", OP_LTE: "lte"},
+    rel_folds={OP_EQ: operator.eq, OP_NEQ: operator.ne, OP_GT: operator.gt, OP_GTE: operator.ge,
+               OP_LT: operator.lt, OP_LTE: operator.le}
 )
 FloatType = ExprType("float", float(), 
-    binary_ops={"+", "-", "*", "/"}, 
-    unary_ops={"+", "-"},
-    binary_opcodes={"+": "add", "-": "sub", "*": "fmul", "/": "fdiv"},
-    unary_opcodes={"+": "uadd", "-": "uneg"},
-    binary_folds={"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.floordiv},
-    unary_folds={"+": operator.pos, "-": operator.neg},
-    rel_ops={"==", "!=", "<", ">", "<=", ">="},
-    rel_opcodes={"==": "eq", "!=": "neq", ">": "gt", "<": "lt", ">=": "gte", "<=": "lte"},
-    rel_folds={"==": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge,
-               "<": operator.lt, "<=": operator.le}
+    binary_ops={OP_ADD, OP_SUB, OP_MUL, OP_DIV}, 
+    unary_ops={OP_ADD, OP_SUB},
+    binary_opcodes={OP_ADD: "add", OP_SUB: "sub", OP_MUL: "fmul", OP_DIV: "fdiv"},
+    unary_opcodes={OP_ADD: "uadd", OP_SUB: "uneg"},
+    binary_folds={OP_ADD: operator.add, OP_SUB: operator.sub, OP_MUL: operator.mul, OP_DIV: operator.floordiv},
+    unary_folds={OP_ADD: operator.pos, OP_SUB: operator.neg},
+    rel_ops={OP_EQ, OP_NEQ, OP_LT, OP_GT, OP_LTE, OP_GTE},
+    rel_opcodes={OP_EQ: "eq", OP_NEQ: "neq", OP_GT: "gt", OP_LT: "lt", OP_GTE: "gte", OP_LTE: "lte"},
+    rel_folds={OP_EQ: operator.eq, OP_NEQ: operator.ne, OP_GT: operator.gt, OP_GTE: operator.ge,
+               OP_LT: operator.lt, OP_LTE: operator.le}
 )
 StringType = ExprType("string", str(), 
-    binary_ops={"+"},
-    binary_opcodes={"+": "add"},
-    binary_folds={"+": operator.add},
-    rel_ops={"==", "!="},
-    rel_opcodes={"==": "eq", "!=": "neq"},
-    rel_folds={"==": operator.eq, "!=": operator.ne}
+    binary_ops={OP_ADD},
+    binary_opcodes={OP_ADD: "add"},
+    binary_folds={OP_ADD: operator.add},
+    rel_ops={OP_EQ, OP_NEQ},
+    rel_opcodes={OP_EQ: "eq", OP_NEQ: "neq"},
+    rel_folds={OP_EQ: operator.eq, OP_NEQ: operator.ne}
 )
 BoolType = ExprType("bool", bool(),
-    unary_ops={"!"},
-    rel_ops={"==", "!=", "&&", "||"},
-    rel_opcodes={"==": "eq", "!=": "neq", "&&": "land", "||": "lor"},
-    rel_folds={"==": operator.eq, "!=": operator.ne, "&&": operator.and_, "||": operator.or_},
-    unary_opcodes={"!": "not"},
-    unary_folds={"!": operator.not_}
+    unary_ops={OP_NOT},
+    rel_ops={OP_EQ, OP_NEQ, OP_LAND, OP_LOR},
+    rel_opcodes={OP_EQ: "eq", OP_NEQ: "neq", OP_LAND: "land", OP_LOR: "lor"},
+    rel_folds={OP_EQ: operator.eq, OP_NEQ: operator.ne, OP_LAND: operator.and_, OP_LOR: operator.or_},
+    unary_opcodes={OP_NOT: "not"},
+    unary_folds={OP_NOT: operator.not_}
 )
@@ -0,0 +1,31 @@
+/* cascade.e
+
+   A failed check gives its expression no type, so enclosing
+   expressions and statements must not report further errors for it.
+   The same holds for constants and variables declared from such an
+   expression or with an invalid type name: using them later is not
+   an error.  Each error below should be reported exactly once.
+   */
+
+var a int = 2;
+var w int = -"x" * 2;       // Type error:  Unsupported operator - (only this one)
+
+const c = 1 + "x";          // Type error:  int + string (only this one)
+var v int = c;              // Good.  c has no type
+var u d;                    // Type error:  d is not a valid type (only this one)
+
+func main int() {
+    var z bool;
+    z = !1;                 // Type error:  Unsupported operator ! (only this one)
+    z = (a < 2.5) == true;  // Type error:  int < float (only this one)
+    z = !(a + "x");         // Type error:  int + string (only this one)
+    print -"x" + 1;         // Type error:  Unsupported operator - (only this one)
+    a = c;                  // Good.  c has no type
+    print c + 1;            // Good.
+    print u;                // Good.  u has no type
+}
+
+func foo int(p q) {         // Type error:  q is not a valid type (only this one)
+    print p;                // Good.  p has no type
+    print p + 1;            // Good.
+}
@@ -0,0 +1,16 @@
+/* vardeclinit.e
+
+   Initializers of var declarations must match the declared type.
+   */
+
+var a int = 2;        // Good.
+var b float = 2.5;    // Good.
+var c int = 2.5;      // Type error:  Cannot assign float to int
+var d string = 3;     // Type error:  Cannot assign int to string
+var e bool = a < 3;   // Good.
+var f int = a < 3;    // Type error:  Cannot assign bool to int
+
+func main int() {
+    var x int = 2.5;  // Type error:  Cannot assign float to int
+    var y float = b;  // Good.
+}